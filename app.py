@@ -1,7 +1,12 @@
 import streamlit as st
 import sqlite3
+import os
+import time
 import pandas as pd
-from datetime import datetime, timedelta
+import altair as alt
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+from streamlit_autorefresh import st_autorefresh
 
 # Page configuration
 st.set_page_config(
@@ -13,6 +18,111 @@ st.set_page_config(
 
 DB_NAME = "log.db"
 
+# Icon shown next to each alert type
+ALERT_COLORS = {
+    'CPU': '🔴',
+    'MEMORY': '🟠',
+    'DISK': '🟡',
+    'PING': '🔵'
+}
+
+# One row of alerts_log as shown in Recent Alerts
+Alert = namedtuple('Alert', 'id timestamp alert_type message')
+
+# Theme stylesheets
+DARK_CSS = """
+<style>
+/* Main app background */
+.stApp {
+    background-color: #0E1117;
+    color: #FFFFFF;
+}
+
+/* Remove white header bar */
+header {
+    background-color: #0E1117 !important;
+}
+
+/* Top toolbar */
+.stAppToolbar {
+    background-color: #0E1117 !important;
+}
+
+/* Sidebar */
+.stSidebar {
+    background-color: #262730;
+}
+
+/* Text colors */
+.stMarkdown, .stText, p, span, label {
+    color: #FFFFFF !important;
+}
+h1, h2, h3, h4, h5, h6 {
+    color: #FFFFFF !important;
+}
+
+/* Metrics */
+.stMetric label {
+    color: #FFFFFF !important;
+}
+.stMetric .metric-value {
+    color: #FFFFFF !important;
+}
+        
+/* All emotion cache text elements */
+[class*="st-emotion-cache"] {
+    color: #FFFFFF !important;
+}
+
+/* Buttons */
+.stButton button {
+    background-color: #262730;
+    color: #FFFFFF;
+}
+</style>
+"""
+
+LIGHT_CSS = """
+<style>
+/* Main app background */
+.stApp {
+    background-color: #FFFFFF;
+    color: #262730;
+}
+
+/* Header */
+header {
+    background-color: #FFFFFF !important;
+}
+
+/* Top toolbar */
+.stAppToolbar {
+    background-color: #FFFFFF !important;
+}
+
+/* Sidebar */
+.stSidebar {
+    background-color: #F0F2F6;
+}
+
+/* Text colors */
+.stMarkdown, .stText, p, span, label {
+    color: #262730 !important;
+}
+h1, h2, h3, h4, h5, h6 {
+    color: #262730 !important;
+}
+
+/* Metrics */
+.stMetric label {
+    color: #262730 !important;
+}
+.stMetric .metric-value {
+    color: #262730 !important;
+}
+</style>
+"""
+
 # Initialize session state for settings
 if 'dark_mode' not in st.session_state:
     st.session_state.dark_mode = False
@@ -20,166 +130,227 @@ if 'auto_refresh' not in st.session_state:
     st.session_state.auto_refresh = False
 if 'refresh_interval' not in st.session_state:
     st.session_state.refresh_interval = 30
+# Part of every data cache key. Starts shared so first loads hit the same
+# entries; a refresh sets a per-session unique value to reload this session only
+if 'cache_epoch' not in st.session_state:
+    st.session_state.cache_epoch = 0
 
-# Apply custom theme styling
-if st.session_state.dark_mode:
-    st.markdown("""
-        <style>
-        /* Main app background */
-        .stApp {
-            background-color: #0E1117;
-            color: #FFFFFF;
-        }
-        
-        /* Remove white header bar */
-        header {
-            background-color: #0E1117 !important;
-        }
-        
-        /* Top toolbar */
-        .stAppToolbar {
-            background-color: #0E1117 !important;
-        }
-        
-        /* Sidebar */
-        .stSidebar {
-            background-color: #262730;
-        }
-        
-        /* Text colors */
-        .stMarkdown, .stText, p, span, label {
-            color: #FFFFFF !important;
-        }
-        h1, h2, h3, h4, h5, h6 {
-            color: #FFFFFF !important;
-        }
-        
-        /* Metrics */
-        .stMetric label {
-            color: #FFFFFF !important;
-        }
-        .stMetric .metric-value {
-            color: #FFFFFF !important;
-        }
-                
-        /* All emotion cache text elements */
-        [class*="st-emotion-cache"] {
-            color: #FFFFFF !important;
-        }
-        
-        /* Buttons */
-        .stButton button {
-            background-color: #262730;
-            color: #FFFFFF;
-        }
-        </style>
-    """, unsafe_allow_html=True)
-else:
-    st.markdown("""
-        <style>
-        /* Main app background */
-        .stApp {
-            background-color: #FFFFFF;
-            color: #262730;
-        }
-        
-        /* Header */
-        header {
-            background-color: #FFFFFF !important;
-        }
-        
-        /* Top toolbar */
-        .stAppToolbar {
-            background-color: #FFFFFF !important;
-        }
-        
-        /* Sidebar */
-        .stSidebar {
-            background-color: #F0F2F6;
-        }
-        
-        /* Text colors */
-        .stMarkdown, .stText, p, span, label {
-            color: #262730 !important;
-        }
-        h1, h2, h3, h4, h5, h6 {
-            color: #262730 !important;
-        }
-        
-        /* Metrics */
-        .stMetric label {
-            color: #262730 !important;
-        }
-        .stMetric .metric-value {
-            color: #262730 !important;
-        }
-        </style>
-    """, unsafe_allow_html=True)
+# Apply custom theme styling (re-sent every rerun, otherwise Streamlit drops it from the page)
+st.markdown(DARK_CSS if st.session_state.dark_mode else LIGHT_CSS, unsafe_allow_html=True)
 
 # Database connection functions
-@st.cache_data(ttl=10)
-def get_system_logs(ping_filter=None, date_filter=None, cpu_threshold=None):
-    """Fetch system logs from database with optional filters"""
-    conn = sqlite3.connect(DB_NAME)
+@st.cache_resource
+def get_conn():
+    """Shared SQLite connection reused across reruns and sessions"""
+    conn = sqlite3.connect(DB_NAME, check_same_thread=False, isolation_level=None)
+    # WAL lets the dashboard read while the logger is writing
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA mmap_size=268435456")
+    conn.execute("PRAGMA cache_size=-65536")
+    return conn
+
+@st.cache_resource
+def ensure_db():
+    """Check the logger's tables exist and create the dashboard indexes (once per process)"""
+    # Checked before connecting, since sqlite3.connect would create an empty file
+    if not os.path.exists(DB_NAME):
+        raise FileNotFoundError(f"Database '{DB_NAME}' not found")
+    
+    conn = get_conn()
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    missing = {'system_log', 'alerts_log'} - tables
+    if missing:
+        raise sqlite3.OperationalError(f"Missing tables: {', '.join(sorted(missing))}")
+    
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_syslog_ts ON system_log(timestamp)")
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_syslog_violations ON system_log(id)
+        WHERE cpu > 80 OR memory > 85 OR disk > 90
+    """)
+
+# Let sqlite3 bind date objects from st.date_input directly
+sqlite3.register_adapter(date, date.isoformat)
+
+@st.cache_resource
+def get_query_cache():
+    """Formatted SQL per (template, active filters), kept across reruns so each shape is built once"""
+    return {}
+
+def prepare_log_query(template, ping_filter=None, date_filter=None, cpu_threshold=None, limit=None):
+    """Fill {where}/{limit} in a system_log query template and collect its parameters"""
+    has_ping = bool(ping_filter and ping_filter != "All")
+    key = (template, has_ping, bool(date_filter), cpu_threshold is not None, limit is not None)
     
-    conditions = []
     params = []
-    
-    if ping_filter and ping_filter != "All":
-        conditions.append("ping_status = ?")
+    if has_ping:
         params.append(ping_filter)
-    
     if date_filter:
         start_date, end_date = date_filter
-        conditions.append("DATE(timestamp) BETWEEN ? AND ?")
-        params.extend([start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')])
-    
+        params.extend([start_date, end_date + timedelta(days=1)])
     if cpu_threshold is not None:
-        conditions.append("cpu >= ?")
         params.append(cpu_threshold)
+    if limit is not None:
+        params.append(limit)
+    
+    query_cache = get_query_cache()
+    query = query_cache.get(key)
+    if query is None:
+        conditions = []
+        if has_ping:
+            conditions.append("ping_status = ?")
+        if date_filter:
+            # Range on the raw column so idx_syslog_ts can be used
+            conditions.append("timestamp >= ? AND timestamp < ?")
+        if cpu_threshold is not None:
+            conditions.append("cpu >= ?")
+        
+        where_clause = " AND ".join(conditions) if conditions else "1=1"
+        limit_clause = "LIMIT ?" if limit is not None else ""
+        query = template.format(where=where_clause, limit=limit_clause)
+        query_cache[key] = query
+    
+    return query, params
+
+def fetch_dataframe(query, params, columns):
+    """Run a query and wrap the rows in a DataFrame without pandas' SQL layer"""
+    rows = get_conn().execute(query, params).fetchall()
+    return pd.DataFrame.from_records(rows, columns=columns)
+
+@st.cache_data(ttl=10)
+def get_system_logs(epoch, ping_filter=None, date_filter=None, cpu_threshold=None, limit=None):
+    """Fetch system logs from database with optional filters"""
+    query, params = prepare_log_query("""
+        SELECT id, timestamp, cpu, memory, disk, ping_status, ping_ms
+        FROM system_log
+        WHERE {where}
+        ORDER BY id DESC
+        {limit}
+    """, ping_filter, date_filter, cpu_threshold, limit)
+    
+    return fetch_dataframe(query, params, ['id', 'timestamp', 'cpu', 'memory', 'disk', 'ping_status', 'ping_ms'])
+
+@st.cache_data(ttl=10)
+def get_log_count(epoch, ping_filter=None, date_filter=None, cpu_threshold=None):
+    """Count system logs matching the filters"""
+    conn = get_conn()
+    
+    query, params = prepare_log_query(
+        "SELECT COUNT(*) FROM system_log WHERE {where}",
+        ping_filter, date_filter, cpu_threshold
+    )
+    return conn.execute(query, params).fetchone()[0]
+
+@st.cache_data(ttl=10)
+def get_summary_stats(epoch, ping_filter=None, date_filter=None, cpu_threshold=None):
+    """Get average/max/min of each resource over the filtered logs"""
+    conn = get_conn()
+    
+    query, params = prepare_log_query("""
+        SELECT AVG(cpu), MAX(cpu), MIN(cpu),
+               AVG(memory), MAX(memory), MIN(memory),
+               AVG(disk), MAX(disk), MIN(disk)
+        FROM system_log
+        WHERE {where}
+    """, ping_filter, date_filter, cpu_threshold)
+    row = conn.execute(query, params).fetchone()
     
-    where_clause = " AND ".join(conditions) if conditions else "1=1"
-    query = f"SELECT * FROM system_log WHERE {where_clause} ORDER BY id DESC"
+    return {
+        metric: {'avg': row[i * 3], 'max': row[i * 3 + 1], 'min': row[i * 3 + 2]}
+        for i, metric in enumerate(['cpu', 'memory', 'disk'])
+    }
+
+@st.cache_data(ttl=10)
+def get_ping_counts(epoch, ping_filter=None, date_filter=None, cpu_threshold=None):
+    """Count filtered logs per ping status"""
+    conn = get_conn()
+    
+    query, params = prepare_log_query("""
+        SELECT ping_status, COUNT(*)
+        FROM system_log
+        WHERE {where}
+        GROUP BY ping_status
+        ORDER BY COUNT(*) DESC
+    """, ping_filter, date_filter, cpu_threshold)
+    rows = conn.execute(query, params).fetchall()
+    
+    return rows
+
+@st.cache_data(ttl=10)
+def get_chart_series(epoch, ping_filter=None, date_filter=None, cpu_threshold=None, bucket_seconds=60, limit=None):
+    """Average the filtered logs into fixed time buckets for charting"""
+    # Newest buckets are selected first, then returned in chronological order
+    query, params = prepare_log_query("""
+        SELECT * FROM (
+            SELECT datetime(CAST(strftime('%s', timestamp) AS INTEGER) / ? * ?, 'unixepoch') AS timestamp,
+                   AVG(cpu) AS cpu,
+                   AVG(memory) AS memory,
+                   AVG(disk) AS disk
+            FROM system_log
+            WHERE {where}
+            GROUP BY 1
+            ORDER BY 1 DESC
+            {limit}
+        )
+        ORDER BY timestamp
+    """, ping_filter, date_filter, cpu_threshold, limit)
+    params = [bucket_seconds, bucket_seconds] + params
     
-    df = pd.read_sql_query(query, conn, params=params if params else None)
-    conn.close()
+    df = fetch_dataframe(query, params, ['timestamp', 'cpu', 'memory', 'disk'])
+    # Bucket labels come from SQLite datetime(), so the format is fixed
+    df['timestamp'] = pd.to_datetime(df['timestamp'], format='%Y-%m-%d %H:%M:%S', cache=True)
     return df
 
 @st.cache_data(ttl=10)
+def get_ping_series(epoch, ping_filter=None, date_filter=None, cpu_threshold=None, bucket_seconds=60, limit=None):
+    """Average successful ping times of the filtered logs into fixed time buckets"""
+    # Failed pings are logged as -1 and are left out in SQL
+    query, params = prepare_log_query("""
+        SELECT * FROM (
+            SELECT datetime(CAST(strftime('%s', timestamp) AS INTEGER) / ? * ?, 'unixepoch') AS timestamp,
+                   AVG(ping_ms) AS ping_ms
+            FROM system_log
+            WHERE {where} AND ping_ms > 0
+            GROUP BY 1
+            ORDER BY 1 DESC
+            {limit}
+        )
+        ORDER BY timestamp
+    """, ping_filter, date_filter, cpu_threshold, limit)
+    params = [bucket_seconds, bucket_seconds] + params
+    
+    df = fetch_dataframe(query, params, ['timestamp', 'ping_ms'])
+    df['timestamp'] = pd.to_datetime(df['timestamp'], format='%Y-%m-%d %H:%M:%S', cache=True)
+    return df
+
 def get_alerts_log():
     """Fetch alerts from database"""
-    conn = sqlite3.connect(DB_NAME)
-    query = "SELECT * FROM alerts_log ORDER BY id DESC LIMIT 50"
-    df = pd.read_sql_query(query, conn)
-    conn.close()
-    return df
+    query = "SELECT id, timestamp, alert_type, message FROM alerts_log ORDER BY id DESC LIMIT 50"
+    # Plain tuples, so the cached bundle pickles without a reference to Alert
+    return get_conn().execute(query).fetchall()
 
-@st.cache_data(ttl=10)
 def get_statistics():
     """Get database statistics"""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT COUNT(*) FROM system_log")
-    log_count = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM alerts_log")
-    alert_count = cursor.fetchone()[0]
-    
-    # Get latest metrics
-    cursor.execute("""
-        SELECT cpu, memory, disk, ping_status, ping_ms 
-        FROM system_log 
-        ORDER BY id DESC 
-        LIMIT 1
-    """)
-    latest = cursor.fetchone()
-    
-    # Get threshold violations count
-    cursor.execute("SELECT COUNT(*) FROM system_log WHERE cpu > 80 OR memory > 85 OR disk > 90")
-    threshold_violations = cursor.fetchone()[0]
-    
-    conn.close()
+    conn = get_conn()
+    
+    # Counts, threshold violations and latest metrics in a single round trip
+    row = conn.execute("""
+        SELECT
+            (SELECT COUNT(*) FROM system_log),
+            (SELECT COUNT(*) FROM alerts_log),
+            (SELECT COUNT(*) FROM system_log WHERE cpu > 80 OR memory > 85 OR disk > 90),
+            latest.cpu, latest.memory, latest.disk, latest.ping_status, latest.ping_ms
+        FROM (SELECT 1)
+        LEFT JOIN (
+            SELECT cpu, memory, disk, ping_status, ping_ms
+            FROM system_log
+            ORDER BY id DESC
+            LIMIT 1
+        ) AS latest
+    """).fetchone()
+    
+    log_count, alert_count, threshold_violations = row[:3]
+    latest = row[3:] if row[3] is not None else None
     
     return {
         'log_count': log_count,
@@ -192,14 +363,200 @@ def get_statistics():
         'latest_ping_ms': latest[4] if latest else 0
     }
 
+@st.cache_data(ttl=10)
+def get_dashboard_bundle(epoch):
+    """Statistics and recent alerts, shared by the sidebar and dashboard"""
+    return {
+        'stats': get_statistics(),
+        'alerts': get_alerts_log()
+    }
+
+@st.cache_data(ttl=10)
+def build_line_chart_spec(df, height, color=None):
+    """Vega-Lite spec for an Altair line chart of each non-timestamp column of df over time"""
+    long_df = df.melt('timestamp', var_name='Metric', value_name='Value')
+    encoding = {
+        'x': alt.X('timestamp:T', title=None),
+        'y': alt.Y('Value:Q', title=None),
+        'tooltip': ['timestamp:T', 'Metric:N', alt.Tooltip('Value:Q', format='.1f')]
+    }
+    
+    if color:
+        chart = alt.Chart(long_df).mark_line(color=color)
+    else:
+        chart = alt.Chart(long_df).mark_line()
+        encoding['color'] = alt.Color('Metric:N', title=None)
+    
+    # to_dict() builds and validates the full spec, so that is the part worth caching
+    return chart.encode(**encoding).properties(height=height).to_dict()
+
+@st.fragment
+def _metrics_fragment(stats):
+    """Current system status metric strip"""
+    st.header("📈 Current System Status")
+    col1, col2, col3, col4, col5, col6 = st.columns(6)
+    
+    with col1:
+        st.metric("CPU Usage", f"{stats['latest_cpu']:.1f}%", 
+                 delta=f"{stats['latest_cpu'] - 80:.1f}%" if stats['latest_cpu'] > 80 else None,
+                 delta_color="inverse")
+    
+    with col2:
+        st.metric("Memory Usage", f"{stats['latest_memory']:.1f}%",
+                 delta=f"{stats['latest_memory'] - 85:.1f}%" if stats['latest_memory'] > 85 else None,
+                 delta_color="inverse")
+    
+    with col3:
+        st.metric("Disk Usage", f"{stats['latest_disk']:.1f}%",
+                 delta=f"{stats['latest_disk'] - 90:.1f}%" if stats['latest_disk'] > 90 else None,
+                 delta_color="inverse")
+    
+    with col4:
+        ping_status_icon = "🟢" if stats['latest_ping_status'] == "UP" else "🔴"
+        st.metric("Ping Status", f"{ping_status_icon} {stats['latest_ping_status']}")
+    
+    with col5:
+        ping_display = f"{stats['latest_ping_ms']:.1f}ms" if stats['latest_ping_ms'] > 0 else "N/A"
+        st.metric("Ping Time", ping_display)
+    
+    with col6:
+        st.metric("Alert Count", stats['threshold_violations'], 
+                 delta=f"{stats['threshold_violations']}" if stats['threshold_violations'] > 0 else "0",
+                 delta_color="inverse")
+
+@st.fragment
+def _alerts_fragment(stats, alerts):
+    """Recent alerts section"""
+    st.header("🚨 Recent Alerts")
+    
+    if alerts:
+        col1, col2 = st.columns([1, 3])
+        with col1:
+            st.metric("Total Alerts", stats['alert_count'])
+        
+        with st.expander(f"View Latest {min(20, len(alerts))} Alerts", expanded=False):
+            for alert in alerts[:20]:
+                alert_color = ALERT_COLORS.get(alert.alert_type, '⚪')
+                st.warning(f"{alert_color} **{alert.timestamp}** - {alert.message}")
+    else:
+        st.success("✅ No alerts triggered! All systems operating normally.")
+
+@st.fragment
+def _logs_fragment(log_filters, stats):
+    """System logs table; the records slider only reruns this section"""
+    st.header("📋 System Logs")
+    # Rendered on every run, so its value survives filters that match nothing
+    num_records = st.slider("Records to Display", 5, 100, 20)
+    filtered_count = get_log_count(st.session_state.cache_epoch, *log_filters)
+    
+    if filtered_count == 0:
+        st.warning("No data available matching the current filters.")
+        return
+    
+    df = get_system_logs(st.session_state.cache_epoch, *log_filters, limit=num_records)
+    
+    st.info(f"Showing {min(num_records, filtered_count)} of {filtered_count} filtered records (Total: {stats['log_count']})")
+    
+    # cache_data returns a fresh copy, so df can be modified in place
+    # Failed pings are logged as -1; leave those cells empty
+    df['ping_ms'] = df['ping_ms'].where(df['ping_ms'] > 0)
+    
+    # Values stay numeric and are formatted client-side
+    st.dataframe(
+        df,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            'cpu': st.column_config.NumberColumn(format="%.1f%%"),
+            'memory': st.column_config.NumberColumn(format="%.1f%%"),
+            'disk': st.column_config.NumberColumn(format="%.1f%%"),
+            'ping_ms': st.column_config.NumberColumn(format="%.1fms")
+        }
+    )
+
+@st.fragment
+def _charts_fragment(log_filters):
+    """Performance charts and summary tables"""
+    st.header("📊 Performance Charts")
+    
+    # Per-minute averages of the filtered data for charts
+    chart_df = get_chart_series(st.session_state.cache_epoch, *log_filters, limit=500)
+    
+    if chart_df.empty:
+        st.info("No data available for charts with current filters.")
+        return
+    
+    chart_data = chart_df.rename(columns={
+        'cpu': 'CPU %',
+        'memory': 'Memory %',
+        'disk': 'Disk %'
+    })
+    
+    st.subheader("System Resource Usage Over Time")
+    st.vega_lite_chart(build_line_chart_spec(chart_data, 400), use_container_width=True)
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.caption("🔴 CPU Threshold: 80%")
+    with col2:
+        st.caption("🟠 Memory Threshold: 85%")
+    with col3:
+        st.caption("🟡 Disk Threshold: 90%")
+    
+    st.markdown("---")
+    
+    # Ping Response Time Chart
+    st.subheader("Network Ping Response Time")
+    
+    ping_df = get_ping_series(st.session_state.cache_epoch, *log_filters, limit=500)
+    
+    if not ping_df.empty:
+        ping_chart = ping_df.rename(columns={'ping_ms': 'Ping (ms)'})
+        
+        st.vega_lite_chart(build_line_chart_spec(ping_chart, 300, color='#6C5CE7'), use_container_width=True)
+    else:
+        st.info("No successful ping data available for current filters.")
+    
+    st.markdown("---")
+    
+    # Summary statistics
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("📊 Average Resource Usage")
+        summary = get_summary_stats(st.session_state.cache_epoch, *log_filters)
+        metrics = ['cpu', 'memory', 'disk']
+        avg_stats = pd.DataFrame({
+            'Metric': ['CPU', 'Memory', 'Disk'],
+            'Average (%)': [f"{summary[m]['avg']:.2f}" for m in metrics],
+            'Max (%)': [f"{summary[m]['max']:.2f}" for m in metrics],
+            'Min (%)': [f"{summary[m]['min']:.2f}" for m in metrics]
+        })
+        st.dataframe(avg_stats, use_container_width=True, hide_index=True)
+    
+    with col2:
+        st.subheader("🌐 Ping Status Summary")
+        ping_counts = get_ping_counts(st.session_state.cache_epoch, *log_filters)
+        total_pings = sum(count for _, count in ping_counts)
+        ping_summary = pd.DataFrame({
+            'Status': [status for status, _ in ping_counts],
+            'Count': [count for _, count in ping_counts],
+            'Percentage': [f"{(count/total_pings*100):.1f}%" for _, count in ping_counts]
+        })
+        st.dataframe(ping_summary, use_container_width=True, hide_index=True)
+
 def dashboard_page():
     """Main dashboard page"""
+    # Client-side timer triggers the rerun, so no server thread sleeps
+    if st.session_state.auto_refresh:
+        st_autorefresh(interval=st.session_state.refresh_interval * 1000, key="dashrefresh")
+    
     st.title("📊 System Monitor Dashboard")
     st.markdown("---")
     
     # Filters in columns
     st.subheader("🔍 Filters")
-    filter_col1, filter_col2, filter_col3, filter_col4 = st.columns(4)
+    filter_col1, filter_col2, filter_col3 = st.columns(3)
     
     with filter_col1:
         ping_filter = st.selectbox("Ping Status", ["All", "UP", "DOWN"])
@@ -210,9 +567,6 @@ def dashboard_page():
     with filter_col3:
         use_date_filter = st.checkbox("Enable Date Filter")
     
-    with filter_col4:
-        num_records = st.slider("Records to Display", 5, 100, 20)
-    
     # Date filter
     date_filter = None
     if use_date_filter:
@@ -225,182 +579,39 @@ def dashboard_page():
     
     st.markdown("---")
     
-    # Get data
+    # Failures are raised (and not cached) by ensure_db, so this is retried each rerun
     try:
-        stats = get_statistics()
-        
-        # Display key metrics
-        st.header("📈 Current System Status")
-        col1, col2, col3, col4, col5, col6 = st.columns(6)
-        
-        with col1:
-            st.metric("CPU Usage", f"{stats['latest_cpu']:.1f}%", 
-                     delta=f"{stats['latest_cpu'] - 80:.1f}%" if stats['latest_cpu'] > 80 else None,
-                     delta_color="inverse")
-        
-        with col2:
-            st.metric("Memory Usage", f"{stats['latest_memory']:.1f}%",
-                     delta=f"{stats['latest_memory'] - 85:.1f}%" if stats['latest_memory'] > 85 else None,
-                     delta_color="inverse")
-        
-        with col3:
-            st.metric("Disk Usage", f"{stats['latest_disk']:.1f}%",
-                     delta=f"{stats['latest_disk'] - 90:.1f}%" if stats['latest_disk'] > 90 else None,
-                     delta_color="inverse")
-        
-        with col4:
-            ping_status_icon = "🟢" if stats['latest_ping_status'] == "UP" else "🔴"
-            st.metric("Ping Status", f"{ping_status_icon} {stats['latest_ping_status']}")
-        
-        with col5:
-            ping_display = f"{stats['latest_ping_ms']:.1f}ms" if stats['latest_ping_ms'] > 0 else "N/A"
-            st.metric("Ping Time", ping_display)
-        
-        with col6:
-            st.metric("Alert Count", stats['threshold_violations'], 
-                     delta=f"{stats['threshold_violations']}" if stats['threshold_violations'] > 0 else "0",
-                     delta_color="inverse")
-        
-        st.markdown("---")
-        
-        # Alerts section
-        st.header("🚨 Recent Alerts")
-        alerts_df = get_alerts_log()
-        
-        if not alerts_df.empty:
-            col1, col2 = st.columns([1, 3])
-            with col1:
-                st.metric("Total Alerts", stats['alert_count'])
-            
-            with st.expander(f"View Latest {min(20, len(alerts_df))} Alerts", expanded=False):
-                for _, alert in alerts_df.head(20).iterrows():
-                    alert_color = {
-                        'CPU': '🔴',
-                        'MEMORY': '🟠',
-                        'DISK': '🟡',
-                        'PING': '🔵'
-                    }.get(alert['alert_type'], '⚪')
-                    
-                    st.warning(f"{alert_color} **{alert['timestamp']}** - {alert['message']}")
-        else:
-            st.success("✅ No alerts triggered! All systems operating normally.")
-        
-        st.markdown("---")
-        
-        # System logs table
-        st.header("📋 System Logs")
-        df = get_system_logs(
-            ping_filter if ping_filter != "All" else None,
-            date_filter,
-            cpu_threshold if cpu_threshold > 0 else None
-        )
-        
-        if not df.empty:
-            st.info(f"Showing {min(num_records, len(df))} of {len(df)} filtered records (Total: {stats['log_count']})")
-            
-            display_df = df.head(num_records).copy()
-            display_df['cpu'] = display_df['cpu'].apply(lambda x: f"{x:.1f}%")
-            display_df['memory'] = display_df['memory'].apply(lambda x: f"{x:.1f}%")
-            display_df['disk'] = display_df['disk'].apply(lambda x: f"{x:.1f}%")
-            display_df['ping_ms'] = display_df['ping_ms'].apply(lambda x: f"{x:.1f}ms" if x > 0 else "N/A")
-            
-            st.dataframe(
-                display_df,
-                use_container_width=True,
-                hide_index=True
-            )
-        else:
-            st.warning("No data available matching the current filters.")
-            return
-        
-        st.markdown("---")
-        
-        # Charts section
-        st.header("📊 Performance Charts")
-        
-        # Use filtered data for charts
-        chart_df = df.sort_values('id')
-        
-        if not chart_df.empty:
-            chart_data = chart_df[['timestamp', 'cpu', 'memory', 'disk']].copy()
-            chart_data = chart_data.rename(columns={
-                'cpu': 'CPU %',
-                'memory': 'Memory %',
-                'disk': 'Disk %'
-            })
-            chart_data['timestamp'] = pd.to_datetime(chart_data['timestamp'])
-            chart_data = chart_data.set_index('timestamp')
-            
-            st.subheader("System Resource Usage Over Time")
-            st.line_chart(chart_data, height=400)
-            
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.caption("🔴 CPU Threshold: 80%")
-            with col2:
-                st.caption("🟠 Memory Threshold: 85%")
-            with col3:
-                st.caption("🟡 Disk Threshold: 90%")
-            
-            st.markdown("---")
-            
-            # Ping Response Time Chart
-            st.subheader("Network Ping Response Time")
-            
-            ping_df = chart_df[chart_df['ping_ms'] > 0].copy()
-            
-            if not ping_df.empty:
-                ping_chart = ping_df[['timestamp', 'ping_ms']].copy()
-                ping_chart['timestamp'] = pd.to_datetime(ping_chart['timestamp'])
-                ping_chart = ping_chart.set_index('timestamp')
-                ping_chart = ping_chart.rename(columns={'ping_ms': 'Ping (ms)'})
-                
-                st.line_chart(ping_chart, height=300, color='#6C5CE7')
-            else:
-                st.info("No successful ping data available for current filters.")
-            
-            st.markdown("---")
-            
-            # Summary statistics
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.subheader("📊 Average Resource Usage")
-                avg_stats = pd.DataFrame({
-                    'Metric': ['CPU', 'Memory', 'Disk'],
-                    'Average (%)': [
-                        f"{chart_df['cpu'].mean():.2f}",
-                        f"{chart_df['memory'].mean():.2f}",
-                        f"{chart_df['disk'].mean():.2f}"
-                    ],
-                    'Max (%)': [
-                        f"{chart_df['cpu'].max():.2f}",
-                        f"{chart_df['memory'].max():.2f}",
-                        f"{chart_df['disk'].max():.2f}"
-                    ],
-                    'Min (%)': [
-                        f"{chart_df['cpu'].min():.2f}",
-                        f"{chart_df['memory'].min():.2f}",
-                        f"{chart_df['disk'].min():.2f}"
-                    ]
-                })
-                st.dataframe(avg_stats, use_container_width=True, hide_index=True)
-            
-            with col2:
-                st.subheader("🌐 Ping Status Summary")
-                ping_counts = chart_df['ping_status'].value_counts()
-                ping_summary = pd.DataFrame({
-                    'Status': ping_counts.index,
-                    'Count': ping_counts.values,
-                    'Percentage': [f"{(count/len(chart_df)*100):.1f}%" for count in ping_counts.values]
-                })
-                st.dataframe(ping_summary, use_container_width=True, hide_index=True)
-        else:
-            st.info("No data available for charts with current filters.")
-        
-    except Exception as e:
+        ensure_db()
+    except (FileNotFoundError, sqlite3.OperationalError) as e:
         st.error(f"Error loading data: {e}")
         st.info("Make sure 'log.db' exists in the same directory. Run your logger script first.")
+        return
+    
+    # Get data
+    bundle = get_dashboard_bundle(st.session_state.cache_epoch)
+    stats = bundle['stats']
+    
+    _metrics_fragment(stats)
+    
+    st.markdown("---")
+    
+    _alerts_fragment(stats, [Alert(*row) for row in bundle['alerts']])
+    
+    st.markdown("---")
+    
+    log_filters = (
+        ping_filter if ping_filter != "All" else None,
+        date_filter,
+        cpu_threshold if cpu_threshold > 0 else None
+    )
+    _logs_fragment(log_filters, stats)
+    
+    if get_log_count(st.session_state.cache_epoch, *log_filters) == 0:
+        return
+    
+    st.markdown("---")
+    
+    _charts_fragment(log_filters)
 
 def settings_page():
     """Settings page"""
@@ -458,7 +669,7 @@ def settings_page():
     
     with col1:
         if st.button("🗑️ Clear Cache", use_container_width=True):
-            st.cache_data.clear()
+            st.session_state.cache_epoch = time.time_ns()
             st.success("Cache cleared successfully!")
     
     with col2:
@@ -498,6 +709,7 @@ def about_page():
     - **Streamlit**: Web application framework
     - **SQLite**: Database for storing logs
     - **Pandas**: Data manipulation and analysis
+    - **Altair**: Interactive charts
     - **Python**: Core programming language
     
     ### 📊 Data Collection
@@ -546,7 +758,7 @@ def sidebar_navigation():
         st.header("⚡ Quick Actions")
         
         if st.button("🔄 Refresh Data", use_container_width=True):
-            st.cache_data.clear()
+            st.session_state.cache_epoch = time.time_ns()
             st.rerun()
         
         # Auto-refresh status
@@ -560,12 +772,14 @@ def sidebar_navigation():
         # Database info
         st.header("💾 Database")
         try:
-            stats = get_statistics()
+            ensure_db()
+        except (FileNotFoundError, sqlite3.OperationalError):
+            st.warning("Database not connected")
+        else:
+            stats = get_dashboard_bundle(st.session_state.cache_epoch)['stats']
             st.metric("Total Records", stats['log_count'])
             st.metric("Total Alerts", stats['alert_count'])
             st.metric("Violations", stats['threshold_violations'])
-        except:
-            st.warning("Database not connected")
         
         st.markdown("---")
         st.caption("System Monitor v2.0")
@@ -584,13 +798,6 @@ def main():
         settings_page()
     elif page == "About":
         about_page()
-    
-    # Handle auto-refresh at the end (only on Dashboard)
-    if st.session_state.auto_refresh and page == "Dashboard":
-        import time
-        time.sleep(st.session_state.refresh_interval)
-        st.cache_data.clear()
-        st.rerun()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file